@@ -3,18 +3,30 @@ from datetime import timedelta
 
 from cognite.client.credentials import OAuthClientCredentials
 from cognite.client import CogniteClient, ClientConfig
+from cognite.client.exceptions import CogniteAPIError, CogniteAuthError
 from datetime import datetime, timedelta
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def get_secret(api_url, secret_id):
-    # Set the headers
-    headers = {
-        'Accept': 'application/json, text/plain, */*'
-    }
+# Shared across calls (and warm invocations) so keep-alive connections are reused
+_SESSION = requests.Session()
+_SESSION.headers.update({'Accept': 'application/json, text/plain, */*'})
+# Retry transient gateway/server errors on the secret GET instead of failing the whole run
+_SESSION.mount('https://', HTTPAdapter(
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504), allowed_methods=frozenset(['GET']))
+))
+REQUEST_TIMEOUT = 30  # seconds
+MAX_SYNC_WORKERS = 8  # tags synced concurrently by sync_tag_data (not backfill)
+# Each sync pull is paged so a worker holds at most one page in memory; with
+# 8 workers that stays well inside the function's 1.5 GB even on a 30-day catch-up
+SYNC_PAGE_SIZE = 100_000  # datapoints per retrieve/insert round trip
 
+def get_secret(api_url, secret_id):
     # Make the API request
     try:
-        response = requests.get(f"{api_url}?id={secret_id}", headers=headers)
+        response = _SESSION.get(api_url, params={"id": secret_id}, timeout=REQUEST_TIMEOUT)
         
         # Raise an error if the request was not successful
         response.raise_for_status()
@@ -46,6 +58,45 @@ def create_cognite_client(tenant_id, client_id, client_secret, cdf_cluster, proj
     )
     return CogniteClient(config)
 
+# Source client is kept between warm invocations so the secret fetch and
+# client setup are paid once per container, not once per call
+_source_client = None
+
+def get_source_client():
+    global _source_client
+    if _source_client is not None:
+        # The secret may have been rotated since this client was built; check the
+        # cached credentials before reuse and refetch the secret if they're rejected
+        try:
+            _source_client.iam.token.inspect()
+            return _source_client
+        except CogniteAuthError as e:
+            print(f"Cached source client failed to authenticate - refetching secret. Exception: {e}")
+        except CogniteAPIError as e:
+            if e.code not in (401, 403):
+                # Not an auth problem; let the sync calls surface it as before
+                return _source_client
+            print(f"Cached source client was rejected ({e.code}) - refetching secret.")
+        _source_client = None
+
+    api_url = "https://testclientsecret.azurewebsites.net/secret/"
+    secret_id = "OID_API"
+    oid_secret = get_secret(api_url, secret_id)
+    if not oid_secret:
+        # Don't cache a client without credentials; retry on the next call
+        return None
+
+    # Create client that pulls from source CDF
+    _source_client = create_cognite_client(
+        tenant_id="48d5043c-cf70-4c49-881c-c638f5796997",
+        client_id="1b90ede3-271e-401b-81a0-a4d52bea3273",
+        client_secret=oid_secret,
+        cdf_cluster="api",
+        project="publicdata",
+        app_name="OID-Api"
+    )
+    return _source_client
+
 # Get list of desired time series from a specific CDF
 def get_tag_list(cognite_client, external_id_prefix, limit):
     ext2id = {}
@@ -56,93 +107,120 @@ def get_tag_list(cognite_client, external_id_prefix, limit):
     # Return dict of external_id to id
     return ext2id
 
-def sync_tag_data(sourceClient, destClient, tag_list):
-    one_month_ago = int((datetime.now() - timedelta(days=30)).timestamp() * 1000)
-    for ext_id, dest_id in tag_list.items():  # Iterate over tag_list dictionary
-        try:
-            # For specified destination id, retrieve the latest timestamp from the destination system
-            latest_data = destClient.time_series.data.retrieve_latest(id=dest_id)
-
-            # Check if a timestamp was returned; if not, set to one month ago
-            if latest_data and latest_data.timestamp:
-                latest_timestamp = latest_data.timestamp[0]  # In milliseconds
-            else:
-                latest_timestamp = one_month_ago
-
-            # Check if the latest timestamp is more than a month in the past
-            if latest_timestamp < one_month_ago:
-                latest_timestamp = one_month_ago  # Set to one month ago if too old
-        except Exception as e:
-            # If the tag doesn't exist or retrieval fails, log it and skip to the next tag
-            print(f"Error retrieving latest timestamp for tag {dest_id} in destination system. Skipping. Exception: {e}")
-            continue
+def sync_tag(sourceClient, destClient, ext_id, dest_id, one_month_ago):
+    try:
+        # For specified destination id, retrieve the latest timestamp from the destination system
+        latest_data = destClient.time_series.data.retrieve_latest(id=dest_id)
+
+        # Check if a timestamp was returned; if not, set to one month ago
+        if latest_data and latest_data.timestamp:
+            latest_timestamp = latest_data.timestamp[0]  # In milliseconds
+        else:
+            latest_timestamp = one_month_ago
 
+        # Check if the latest timestamp is more than a month in the past
+        if latest_timestamp < one_month_ago:
+            latest_timestamp = one_month_ago  # Set to one month ago if too old
+    except Exception as e:
+        # If the tag doesn't exist or retrieval fails, log it and skip to the next tag
+        print(f"Error retrieving latest timestamp for tag {dest_id} in destination system. Skipping. Exception: {e}")
+        return
+
+    cursor = latest_timestamp
+    synced = 0
+    while True:
         try:
-            # Retrieve data from the source system starting from the latest timestamp
-            new_datapoints = sourceClient.time_series.data.retrieve(
+            # Pull one bounded page from the source system, starting at the cursor
+            page = sourceClient.time_series.data.retrieve(
                 external_id=ext_id,
-                start=latest_timestamp
+                start=cursor,
+                limit=SYNC_PAGE_SIZE
             )
-            if not new_datapoints:
-                print(f"No datapoints for {ext_id} - moving on.")
-                continue
         except Exception as e:
             print(f"Error retrieving data for tag {ext_id} from source system. Skipping. Exception: {e}")
-            continue
+            return
+        if not page:
+            break
 
         try:
-            # Insert the new data into the destination system using the destination id
+            # Insert the page into the destination system using the destination id
             destClient.time_series.data.insert(
-                datapoints=new_datapoints,
+                datapoints=page,
                 id=dest_id  # Use the destination id for insertion
             )
-            print(f"Data successfully synced for tag {ext_id} (dest id: {dest_id}).")
         except Exception as e:
             print(f"Error inserting data for tag {ext_id} (dest id: {dest_id}) into destination system. Exception: {e}")
+            return
+        synced += len(page)
 
-def backfill_data(sourceClient, destClient, tag_list, backfillStartTime, backfillEndTime, granularity=None):
-    for ext_id, dest_id in tag_list.items():
-        try:
-            retrieve_params = {
-                "external_id": ext_id,
-                "start": backfillStartTime,
-                "end": backfillEndTime
-            }
-            if granularity:
-                retrieve_params.update({"aggregates": "interpolation", "granularity": granularity})
-            
-            new_datapoints = sourceClient.time_series.data.retrieve(**retrieve_params)
+        if len(page) < SYNC_PAGE_SIZE:
+            break
+        cursor = page.timestamp[-1] + 1
+
+    if synced:
+        print(f"Data successfully synced for tag {ext_id} (dest id: {dest_id}): {synced} datapoints.")
+    else:
+        print(f"No datapoints for {ext_id} - moving on.")
+
+def backfill_tag(sourceClient, destClient, ext_id, dest_id, backfillStartTime, backfillEndTime, granularity=None):
+    try:
+        retrieve_params = {
+            "external_id": ext_id,
+            "start": backfillStartTime,
+            "end": backfillEndTime
+        }
+        if granularity:
+            retrieve_params.update({"aggregates": "interpolation", "granularity": granularity})
+        
+        new_datapoints = sourceClient.time_series.data.retrieve(**retrieve_params)
+        
+        if not new_datapoints:
+            print(f"No datapoints for {ext_id} - moving on.")
+            return
+
+        if granularity:  # Aggregates are used
+            values = getattr(new_datapoints, 'interpolation', None)
+        else:  # Raw data
+            values = getattr(new_datapoints, 'value', None)
+
+        if hasattr(new_datapoints, 'timestamp') and values is not None:
+            formatted_datapoints = [
+                (ts, val) 
+                for ts, val in zip(new_datapoints.timestamp, values)
+                if val is not None
+            ]
+        else:
+            formatted_datapoints = []  # Avoid insertion if data is invalid    
             
-            if not new_datapoints:
-                print(f"No datapoints for {ext_id} - moving on.")
-                continue
-
-            if granularity:  # Aggregates are used
-                values = getattr(new_datapoints, 'interpolation', None)
-            else:  # Raw data
-                values = getattr(new_datapoints, 'value', None)
-
-            if hasattr(new_datapoints, 'timestamp') and values is not None:
-                formatted_datapoints = [
-                    (ts, val) 
-                    for ts, val in zip(new_datapoints.timestamp, values)
-                    if val is not None
-                ]
-            else:
-                formatted_datapoints = []  # Avoid insertion if data is invalid    
-                
-        except Exception as e:
-            print(f"Error retrieving data for tag {ext_id} from source system. Skipping. Exception: {e}")
-            continue
+    except Exception as e:
+        print(f"Error retrieving data for tag {ext_id} from source system. Skipping. Exception: {e}")
+        return
 
-        try:
-            destClient.time_series.data.insert(
-                datapoints=formatted_datapoints,
-                id=dest_id
-            )
-            print(f"Data successfully synced for tag {ext_id} (dest id: {dest_id}).")
-        except Exception as e:
-            print(f"Error inserting data for tag {ext_id} (dest id: {dest_id}) into destination system. Exception: {e}")
+    try:
+        destClient.time_series.data.insert(
+            datapoints=formatted_datapoints,
+            id=dest_id
+        )
+        print(f"Data successfully synced for tag {ext_id} (dest id: {dest_id}).")
+    except Exception as e:
+        print(f"Error inserting data for tag {ext_id} (dest id: {dest_id}) into destination system. Exception: {e}")
+
+# Tags are independent and the work is network-bound, so sync them concurrently
+def sync_tag_data(sourceClient, destClient, tag_list):
+    one_month_ago = int((datetime.now() - timedelta(days=30)).timestamp() * 1000)
+    with ThreadPoolExecutor(max_workers=MAX_SYNC_WORKERS) as executor:
+        futures = [
+            executor.submit(sync_tag, sourceClient, destClient, ext_id, dest_id, one_month_ago)
+            for ext_id, dest_id in tag_list.items()
+        ]
+        for future in as_completed(futures):
+            future.result()
+
+# Backfill stays sequential: each tag can pull an unbounded raw range into
+# memory, so running tags in parallel would multiply the function's peak memory
+def backfill_data(sourceClient, destClient, tag_list, backfillStartTime, backfillEndTime, granularity=None):
+    for ext_id, dest_id in tag_list.items():
+        backfill_tag(sourceClient, destClient, ext_id, dest_id, backfillStartTime, backfillEndTime, granularity)
 
 def handle(client, data, secrets=None, function_call_info=None):
     """Handler Function to be Run/Deployed
@@ -156,19 +234,10 @@ def handle(client, data, secrets=None, function_call_info=None):
         response : response or result from the function
     """
 
-    api_url = "https://testclientsecret.azurewebsites.net/secret/"
-    secret_id = "OID_API"
-    oid_secret = get_secret(api_url, secret_id)
-
-    # Create client that pulls from source CDF
-    c_source = create_cognite_client(
-        tenant_id="48d5043c-cf70-4c49-881c-c638f5796997",
-        client_id="1b90ede3-271e-401b-81a0-a4d52bea3273",
-        client_secret=oid_secret,
-        cdf_cluster="api",
-        project="publicdata",
-        app_name="OID-Api"
-    )
+    c_source = get_source_client()
+    if c_source is None:
+        print("Could not fetch the source CDF secret - nothing synced.")
+        return
 
     tag_dict = get_tag_list(client, external_id_prefix="pi:", limit=500)
 
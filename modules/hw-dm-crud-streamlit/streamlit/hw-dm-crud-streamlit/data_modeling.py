@@ -1,6 +1,6 @@
 from cognite.client import CogniteClient
 from cognite.client.data_classes.data_modeling import ViewId, NodeApply, NodeOrEdgeData
-from cognite.client.data_classes.filters import Prefix, ContainsAny, Equals
+from cognite.client.data_classes.filters import Prefix, ContainsAny, Equals, HasData, And
 from cognite.client.exceptions import CogniteAPIError
 
 class View:
@@ -61,12 +61,16 @@ class View:
         Returns:
             list[tuple]: List of (space, external_id) tuples.
         """
-        filter_ = Prefix(["node", "externalId"], external_id_prefix)
+        # Only identifiers are returned, so filter on the view with HasData
+        # instead of asking for its properties through sources
+        filter_ = And(
+            Prefix(["node", "externalId"], external_id_prefix),
+            HasData(views=[self.view.as_id()]),
+        )
         result = self.client.data_modeling.instances.list(
             instance_type="node",
             filter=filter_,
             space=space,
-            sources=[self.view.as_id()],
             limit=-1
         )
         return [(inst.space, inst.external_id) for inst in result]
@@ -139,6 +143,29 @@ class View:
         )
         self.client.data_modeling.instances.apply(nodes=[node])
 
+    def upsert_instances(self, items: list[tuple[str, dict]], space: str):
+        """
+        Upsert several instances in a single apply request.
+
+        Only the given properties are written; other existing properties are
+        left untouched, so no retrieve is needed to merge them.
+
+        Args:
+            items (list[tuple[str, dict]]): (external_id, properties) pairs.
+            space (str): Space of the instances.
+        """
+        if not items:
+            return
+        nodes = [
+            NodeApply(
+                space=space,
+                external_id=external_id,
+                sources=[NodeOrEdgeData(source=self.view.as_id(), properties=properties)]
+            )
+            for external_id, properties in items
+        ]
+        self.client.data_modeling.instances.apply(nodes=nodes)
+
     def count_instances(self, space: str):
         """
         Count total instances in the view.
@@ -149,19 +176,12 @@ class View:
         Returns:
             int: Number of instances.
         """
-        result = self.client.data_modeling.instances.list(
-            instance_type="node",
-            space=space,
-            sources=[self.view.as_id()],
-            limit=1  # We just need to know if any exist
-        )
-        
-        # For a proper count, we'd need to paginate through all results
-        # This is a simplified version that gets a reasonable estimate
+        # Only the number of nodes matters, so filter on the view with HasData
+        # instead of asking for its properties through sources
         total_result = self.client.data_modeling.instances.list(
             instance_type="node",
             space=space,
-            sources=[self.view.as_id()],
+            filter=HasData(views=[self.view.as_id()]),
             limit=-1  # Get all (be careful with large datasets)
         )
         
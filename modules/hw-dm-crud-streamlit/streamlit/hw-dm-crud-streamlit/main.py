@@ -11,8 +11,8 @@ VERSION = "2025.10.05.v1"  # Update this when deploying changes
 
 import streamlit as st
 import pandas as pd
-from typing import List, Dict, Any, Optional
-import time
+import io
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from cognite.client import CogniteClient
@@ -21,6 +21,9 @@ from cognite.client.exceptions import CogniteAPIError
 # Import View class from local data_modeling module
 from data_modeling import View
 
+# Columns a bulk import CSV must provide
+REQUIRED_IMPORT_COLUMNS = ('external_id', 'new_string')
+
 # Initialize NEAT view wrapper for Data Model integration
 @st.cache_resource
 def get_neat_view(_client):
@@ -51,6 +54,12 @@ def get_client():
             st.stop()
 
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def parse_import_csv(data: bytes) -> pd.DataFrame:
+    """Parse an uploaded CSV; cached on its bytes so widget reruns skip the re-parse."""
+    return pd.read_csv(io.BytesIO(data))
+
+
 class NeatDataManager:
     """Handler for managing data in Hello World NEAT data model"""
     
@@ -74,6 +83,10 @@ class NeatDataManager:
             st.error(f"Failed to create instance: {e}")
             return False
     
+    def create_neat_instances(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Create a batch of Hello World NEAT instances in one request; raises on failure"""
+        self.neat_view.upsert_instances(items, space=self.space_id)
+    
     def get_existing_instances(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get existing Hello World NEAT instances"""
         try:
@@ -112,15 +125,10 @@ def main():
     st.sidebar.title("Navigation")
     mode = st.sidebar.radio(
         "Select Mode:",
-        ["Create New Instance", "View Existing Instances", "Bulk Import"]
+        list(MODES)
     )
     
-    if mode == "Create New Instance":
-        create_instance_form(manager)
-    elif mode == "View Existing Instances":
-        view_existing_instances(manager)
-    elif mode == "Bulk Import":
-        bulk_import_form(manager)
+    MODES[mode](manager)
 
 
 def create_instance_form(manager: NeatDataManager):
@@ -281,11 +289,10 @@ def bulk_import_form(manager: NeatDataManager):
     
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
+            df = parse_import_csv(uploaded_file.getvalue())
             
             # Validate columns
-            required_columns = ['external_id', 'new_string']
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            missing_columns = [col for col in REQUIRED_IMPORT_COLUMNS if col not in df.columns]
             
             if missing_columns:
                 st.error(f"Missing required columns: {missing_columns}")
@@ -314,51 +321,69 @@ def bulk_import_form(manager: NeatDataManager):
                 error_count = 0
                 errors = []
                 
-                for i, row in df.iterrows():
+                # One apply request per batch instead of one (plus a retrieve) per row
+                rows = list(zip(df['external_id'].astype(str), df['new_string'].astype(str)))
+                total = len(rows)
+                
+                stopped = False
+                
+                for start in range(0, total, batch_size):
+                    batch = rows[start:start + batch_size]
+                    done = start + len(batch)
+                    # Collapse repeated external_ids in the batch; the last row wins,
+                    # as it did with sequential per-row upserts
+                    latest = {external_id: new_string for external_id, new_string in batch}
                     try:
-                        external_id = str(row['external_id'])
-                        new_string = str(row['new_string'])
+                        manager.create_neat_instances(
+                            [(external_id, {"newString": new_string}) for external_id, new_string in latest.items()]
+                        )
+                        success_count += len(batch)
                         
-                        properties = {"newString": new_string}
-                        
-                        success = manager.create_neat_instance(external_id, properties)
-                        
-                        if success:
-                            success_count += 1
-                        else:
-                            error_count += 1
-                            errors.append(f"Row {i+1}: Failed to create {external_id}")
-                            
-                    except Exception as e:
-                        error_count += 1
-                        errors.append(f"Row {i+1}: {str(e)}")
-                        
-                        if not skip_errors:
-                            st.error(f"Import stopped at row {i+1}: {e}")
-                            break
+                    except Exception:
+                        # Retry the failed batch row by row so only the bad rows are reported
+                        for offset, (external_id, new_string) in enumerate(batch):
+                            row_number = start + offset + 1
+                            if manager.create_neat_instance(external_id, {"newString": new_string}):
+                                success_count += 1
+                            else:
+                                error_count += 1
+                                errors.append(f"Row {row_number}: Failed to create {external_id}")
+                                
+                                if not skip_errors:
+                                    st.error(f"Import stopped at row {row_number}")
+                                    stopped = True
+                                    # Rows after the failing one were never attempted
+                                    done = row_number
+                                    break
                     
                     # Update progress
-                    progress = (i + 1) / len(df)
-                    import_progress.progress(progress)
-                    status_text.text(f"Processing row {i+1}/{len(df)} - Success: {success_count}, Errors: {error_count}")
+                    import_progress.progress(done / total)
+                    status_text.text(f"Processing row {done}/{total} - Success: {success_count}, Errors: {error_count}")
                     
-                    # Small delay to avoid overwhelming the API
-                    time.sleep(0.1)
+                    if stopped:
+                        break
                 
                 # Final results
                 st.success(f"✅ Import completed! Success: {success_count}, Errors: {error_count}")
                 
                 if errors:
                     st.error("Errors encountered:")
-                    for error in errors[:10]:  # Show first 10 errors
-                        st.text(error)
-                    
+                    error_lines = errors[:10]  # Show first 10 errors
                     if len(errors) > 10:
-                        st.text(f"... and {len(errors) - 10} more errors")
+                        error_lines.append(f"... and {len(errors) - 10} more errors")
+                    st.code("\n".join(error_lines), language="text")
                 
         except Exception as e:
             st.error(f"Failed to process file: {e}")
 
 
+# Sidebar mode label -> page renderer
+MODES = {
+    "Create New Instance": create_instance_form,
+    "View Existing Instances": view_existing_instances,
+    "Bulk Import": bulk_import_form,
+}
+
+
 if __name__ == "__main__":
     main()
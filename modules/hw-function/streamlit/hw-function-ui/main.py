@@ -9,6 +9,13 @@ import time
 from datetime import datetime
 
 VERSION = "2025.10.05.v1"  # Update this when deploying changes
+MAX_LOG_CHARS = 65536  # Only the tail of the function logs is rendered
+
+# Session state keys used to hand a button click over to the processing block
+SESSION_DEFAULTS = {
+    'function_triggered': False,
+    'function_name': None,
+}
 
 
 @st.cache_resource
@@ -18,6 +25,20 @@ def get_cognite_client():
     return CogniteClient()
 
 
+def _tail(text, limit=MAX_LOG_CHARS):
+    """Return at most the last `limit` characters of text"""
+    if len(text) <= limit:
+        return text
+    return "...[truncated]...\n" + text[-limit:]
+
+
+def queue_function_call():
+    """Button callback: flag a function call for the name currently entered"""
+    name = st.session_state.name_input
+    if name:
+        st.session_state.update(function_triggered=True, function_name=name)
+
+
 def call_hello_world_function():
     """Call the hw-function and display results"""
     st.header("👋 Hello World Function Demo")
@@ -25,30 +46,24 @@ def call_hello_world_function():
     
     # Input section
     st.subheader("📝 Input")
-    name = st.text_input("Enter your name:", value="World", placeholder="Your name here...")
+    name = st.text_input("Enter your name:", value="World", placeholder="Your name here...", key="name_input")
     
-    # Initialize session state
-    if 'function_triggered' not in st.session_state:
-        st.session_state.function_triggered = False
-    if 'function_name' not in st.session_state:
-        st.session_state.function_name = None
+    # Initialize session state (setdefault leaves existing values alone)
+    for key, default in SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, default)
     
-    # Call function button - just sets flag, doesn't do processing
-    if st.button("🚀 Call Hello World Function", type="primary"):
-        if not name:
-            st.error("Please enter a name")
-        else:
-            # Set session state and trigger rerun
-            st.session_state.function_triggered = True
-            st.session_state.function_name = name
-            st.rerun()  # Immediate rerun shows feedback instantly
+    # Call function button - the callback just sets the flag before this rerun starts,
+    # so the processing block below picks it up in the same pass (no st.rerun needed)
+    if st.button("🚀 Call Hello World Function", type="primary", on_click=queue_function_call) and not name:
+        st.error("Please enter a name")
     
     # ====================================================================
     # PROCESS FUNCTION CALL - Runs outside button handler for instant feedback
     # ====================================================================
     if st.session_state.function_triggered:
-        # Reset flag
+        # Reset flag and read the requested name once for this run
         st.session_state.function_triggered = False
+        function_name = st.session_state.function_name
         
         # INSTANT FEEDBACK - Shows immediately on rerun
         st.success("🚀 **Button clicked!** Processing your request...")
@@ -62,10 +77,10 @@ def call_hello_world_function():
             client = get_cognite_client()
             
             # Call the function
-            status_container.info(f"📞 Calling function with name='{st.session_state.function_name}'...")
+            status_container.info(f"📞 Calling function with name='{function_name}'...")
             call_result = client.functions.call(
                 external_id="hw-function",
-                data={"name": st.session_state.function_name}
+                data={"name": function_name}
             )
             
             status_container.success(f"✅ Function called! Call ID: {call_result.id}")
@@ -74,12 +89,18 @@ def call_hello_world_function():
             st.subheader("⏳ Waiting for Response")
             progress_bar = st.progress(0)
             result_status = st.empty()
-            logs_container = st.container()
+            logs_container = st.empty()
             
+            # Time the wait against a monotonic deadline, so slow status and
+            # log requests count toward the limit instead of only the sleeps
             max_wait = 60  # 1 minute
-            wait_time = 0
+            poll_interval = 2
+            started = time.monotonic()
+            deadline = started + max_wait
+            timed_out = True
             
-            while wait_time < max_wait:
+            while time.monotonic() < deadline:
+                wait_time = time.monotonic() - started
                 # Get function call status
                 call_status = client.functions.calls.retrieve(
                     function_external_id="hw-function",
@@ -88,7 +109,7 @@ def call_hello_world_function():
                 
                 progress = min(wait_time / max_wait, 0.95)
                 progress_bar.progress(progress)
-                result_status.text(f"Status: {call_status.status} ({wait_time}s)")
+                result_status.text(f"Status: {call_status.status} ({wait_time:.0f}s)")
                 
                 # Get logs
                 try:
@@ -98,11 +119,11 @@ def call_hello_world_function():
                     )
                     
                     if logs:
-                        with logs_container:
+                        # Re-render one placeholder per poll instead of appending every line again
+                        log_text = "\n".join(log.message if hasattr(log, 'message') else str(log) for log in logs)
+                        with logs_container.container():
                             st.subheader("📋 Function Logs")
-                            for log in logs:
-                                log_msg = log.message if hasattr(log, 'message') else str(log)
-                                st.text(log_msg)
+                            st.code(_tail(log_text), language="text")
                 except Exception as log_error:
                     # Logs might not be available yet
                     pass
@@ -111,11 +132,8 @@ def call_hello_world_function():
                     progress_bar.progress(1.0)
                     result_status.text("✅ Function completed!")
                     
-                    # Get the result
-                    result = client.functions.calls.retrieve(
-                        function_external_id="hw-function",
-                        call_id=call_result.id
-                    )
+                    # The completed call we just polled already carries the result
+                    result = call_status
                     
                     # Display results
                     st.subheader("🎉 Function Response")
@@ -151,17 +169,18 @@ def call_hello_world_function():
                     else:
                         st.error("❌ No response data received")
                     
+                    timed_out = False
                     break
                     
                 elif call_status.status == "Failed":
                     st.error(f"❌ Function failed: {call_status}")
+                    timed_out = False
                     break
                 
-                # Wait before checking again
-                time.sleep(2)
-                wait_time += 2
+                # Wait before checking again, without sleeping past the deadline
+                time.sleep(max(0, min(poll_interval, deadline - time.monotonic())))
             
-            if wait_time >= max_wait:
+            if timed_out:
                 st.error("⏰ Function call timed out")
                 
         except Exception as e:
@@ -11,23 +11,22 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List
 import sys
 import os
-import plotly.graph_objects as go
 
 sys.path.append(os.path.dirname(__file__))
 
 from utils.mock_data import generate_mock_flares, generate_mock_flare_data
-from utils.calculations import calculate_emissions, load_calculation_params
+from utils.calculations import calculate_emissions
 from utils.visualizations import (
-    create_hrvoc_chart,
     create_composition_chart,
     create_flow_heat_chart,
     create_mass_emissions_chart,
     create_hrvoc_heat_release_chart,
+    create_multi_source_chart,
 )
-from utils.tag_lookup import FLARE_TAG_LOOKUP, get_tag_summary, get_live_tags
+from utils.tag_lookup import FLARE_TAG_LOOKUP, get_tag_summary
 from utils.cdf_data import get_cdf_connection_status
 
 st.set_page_config(
@@ -45,6 +44,16 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# Sidebar label -> period key, and period key -> (lookback, sampling rate)
+PERIOD_OPTIONS = {"Last 24 Hours": "24h", "Last 7 Days": "7d", "Last 30 Days": "30d", "Last 90 Days": "90d"}
+TIME_RANGES = {
+    "24h": (timedelta(days=1), "15min"),
+    "7d": (timedelta(days=7), "1h"),
+    "30d": (timedelta(days=30), "1h"),
+    "90d": (timedelta(days=90), "1d"),
+}
+
+
 @st.cache_data(ttl=3600)
 def get_flare_data(flare_id: str, start_time: datetime, end_time: datetime, sampling_rate: str = "1h"):
     df = generate_mock_flare_data(flare_id, start_time, end_time, sampling_rate)
@@ -52,33 +61,42 @@ def get_flare_data(flare_id: str, start_time: datetime, end_time: datetime, samp
     return df
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def get_connection_status() -> tuple:
+    # Token inspection is a CDF round trip; the sidebar would otherwise repeat it on every rerun
+    return get_cdf_connection_status()
+
+
+def get_source_series(flares: List[Dict], start_time: datetime, end_time: datetime, sampling_rate: str, report_errors: bool = False) -> List[tuple]:
+    """(source, dataframe) for each source whose data loads; failures are skipped (and shown if report_errors)."""
+    series = []
+    for flare in flares:
+        try:
+            series.append((flare, get_flare_data(flare['id'], start_time, end_time, sampling_rate)))
+        except Exception as e:
+            if report_errors:
+                st.error(f"Error loading data for {flare['name']}: {e}")
+    return series
+
+
+def get_source_labels(flares: List[Dict]) -> Dict[str, Dict]:
+    """Selectbox label -> source, built once per page so selections map back without list scans."""
+    return {f"{f['name']} ({f['unit']})": f for f in flares}
+
+
 def get_time_range(period: str) -> tuple:
-    end_time = datetime.now()
-    if period == "24h":
-        start_time = end_time - timedelta(days=1)
-        sampling_rate = "15min"
-    elif period == "7d":
-        start_time = end_time - timedelta(days=7)
-        sampling_rate = "1h"
-    elif period == "30d":
-        start_time = end_time - timedelta(days=30)
-        sampling_rate = "1h"
-    elif period == "90d":
-        start_time = end_time - timedelta(days=90)
-        sampling_rate = "1d"
-    else:
-        start_time = end_time - timedelta(days=7)
-        sampling_rate = "1h"
-    return start_time, end_time, sampling_rate
+    lookback, sampling_rate = TIME_RANGES.get(period, TIME_RANGES["7d"])
+    # Truncate to the minute so get_flare_data's cache key is stable across reruns
+    end_time = datetime.now().replace(second=0, microsecond=0)
+    return end_time - lookback, end_time, sampling_rate
 
 
 def dashboard_overview():
     st.header("🌍 Time Series Dashboard")
     with st.sidebar:
         st.header("Filters")
-        time_period = st.selectbox("Time Period", ["Last 24 Hours", "Last 7 Days", "Last 30 Days", "Last 90 Days"], index=1)
-        period_map = {"Last 24 Hours": "24h", "Last 7 Days": "7d", "Last 30 Days": "30d", "Last 90 Days": "90d"}
-        period_value = period_map[time_period]
+        time_period = st.selectbox("Time Period", list(PERIOD_OPTIONS), index=1)
+        period_value = PERIOD_OPTIONS[time_period]
         flares = generate_mock_flares()
         units = ["All Units"] + sorted(list(set([f['unit'] for f in flares])))
         selected_unit = st.selectbox("Unit", units)
@@ -86,19 +104,13 @@ def dashboard_overview():
 
     start_time, end_time, sampling_rate = get_time_range(period_value)
     st.subheader("Summary Metrics")
-    total_hrvoc = total_heat_release = active_flares = 0
-    data_quality = []
-    for flare in filtered_flares:
-        try:
-            df = get_flare_data(flare['id'], start_time, end_time, sampling_rate)
-            if not df.empty and 'total_hrvoc' in df.columns and 'total_heat_release' in df.columns:
-                total_hrvoc += df['total_hrvoc'].sum()
-                total_heat_release += df['total_heat_release'].sum()
-                active_flares += 1
-                quality_pct = (1 - df['flow_rate'].isna().sum() / len(df)) * 100
-                data_quality.append(quality_pct)
-        except Exception as e:
-            st.error(f"Error loading data for {flare['name']}: {e}")
+    # Load each source once; the metrics, trend charts and summary table all reuse it
+    loaded = get_source_series(filtered_flares, start_time, end_time, sampling_rate, report_errors=True)
+    active = [(flare, df) for flare, df in loaded if not df.empty and 'total_hrvoc' in df.columns and 'total_heat_release' in df.columns]
+    total_hrvoc = sum(df['total_hrvoc'].sum() for _, df in active)
+    total_heat_release = sum(df['total_heat_release'].sum() for _, df in active)
+    active_flares = len(active)
+    data_quality = [(1 - df['flow_rate'].isna().sum() / len(df)) * 100 for _, df in active]
     avg_data_quality = np.mean(data_quality) if data_quality else 0
 
     col1, col2, col3, col4 = st.columns(4)
@@ -113,44 +125,18 @@ def dashboard_overview():
 
     st.divider()
     st.subheader("Aggregate Trends")
-    fig_hrvoc = go.Figure()
-    for flare in filtered_flares:
-        try:
-            df = get_flare_data(flare['id'], start_time, end_time, sampling_rate)
-            if not df.empty and 'total_hrvoc' in df.columns:
-                fig_hrvoc.add_trace(go.Scatter(x=df['timestamp'], y=df['total_hrvoc'], mode='lines', name=flare['name'],
-                    hovertemplate=f'<b>{flare["name"]}</b><br>Time: %{{x}}<br>HRVOC: %{{y:.2f}} lbs/hr<extra></extra>'))
-        except Exception:
-            continue
-    fig_hrvoc.update_layout(title='Multi-Source HRVOC Trend', xaxis_title='Time', yaxis_title='HRVOC (lbs/hr)', hovermode='x unified', height=400, template='plotly_white')
-    st.plotly_chart(fig_hrvoc, use_container_width=True)
-
-    fig_heat = go.Figure()
-    for flare in filtered_flares:
-        try:
-            df = get_flare_data(flare['id'], start_time, end_time, sampling_rate)
-            if not df.empty and 'total_heat_release' in df.columns:
-                fig_heat.add_trace(go.Scatter(x=df['timestamp'], y=df['total_heat_release'], mode='lines', name=flare['name'],
-                    hovertemplate=f'<b>{flare["name"]}</b><br>Time: %{{x}}<br>Heat Release: %{{y:.4f}} MMBTU/hr<extra></extra>'))
-        except Exception:
-            continue
-    fig_heat.update_layout(title='Multi-Source Heat Release Trend', xaxis_title='Time', yaxis_title='Heat Release (MMBTU/hr)', hovermode='x unified', height=400, template='plotly_white')
-    st.plotly_chart(fig_heat, use_container_width=True)
+    chart_series = [(flare['name'], df) for flare, df in loaded]
+    st.plotly_chart(create_multi_source_chart(chart_series, 'total_hrvoc', 'Multi-Source HRVOC Trend', 'HRVOC (lbs/hr)', 'HRVOC', '%{y:.2f} lbs/hr'), use_container_width=True)
+    st.plotly_chart(create_multi_source_chart(chart_series, 'total_heat_release', 'Multi-Source Heat Release Trend', 'Heat Release (MMBTU/hr)', 'Heat Release', '%{y:.4f} MMBTU/hr'), use_container_width=True)
 
     st.divider()
     st.subheader("Source Summary")
     summary_data = []
-    for flare in filtered_flares:
-        try:
-            df = get_flare_data(flare['id'], start_time, end_time, sampling_rate)
-            if not df.empty and 'total_hrvoc' in df.columns and 'total_heat_release' in df.columns:
-                current_hrvoc = df['total_hrvoc'].sum()
-                current_heat = df['total_heat_release'].sum()
-                total_hrvoc_all = sum([get_flare_data(f['id'], start_time, end_time, sampling_rate)['total_hrvoc'].sum() for f in filtered_flares if not get_flare_data(f['id'], start_time, end_time, sampling_rate).empty])
-                pct_of_total = (current_hrvoc / total_hrvoc_all * 100) if total_hrvoc_all > 0 else 0
-                summary_data.append({'Source Name': flare['name'], 'Unit': flare['unit'], 'HRVOC (Current)': f"{current_hrvoc:,.0f} lbs", 'Heat Release (Current)': f"{current_heat:,.2f} MMBTU", '% of Total': f"{pct_of_total:.1f}%", 'Status': 'Active'})
-        except Exception:
-            continue
+    for flare, df in active:
+        current_hrvoc = df['total_hrvoc'].sum()
+        current_heat = df['total_heat_release'].sum()
+        pct_of_total = (current_hrvoc / total_hrvoc * 100) if total_hrvoc > 0 else 0
+        summary_data.append({'Source Name': flare['name'], 'Unit': flare['unit'], 'HRVOC (Current)': f"{current_hrvoc:,.0f} lbs", 'Heat Release (Current)': f"{current_heat:,.2f} MMBTU", '% of Total': f"{pct_of_total:.1f}%", 'Status': 'Active'})
     if summary_data:
         st.dataframe(pd.DataFrame(summary_data), use_container_width=True, hide_index=True)
     else:
@@ -160,12 +146,12 @@ def dashboard_overview():
 def flare_detail():
     st.header("🔍 Source Detail View")
     flares = generate_mock_flares()
-    flare_names = [f"{f['name']} ({f['unit']})" for f in flares]
+    flare_labels = get_source_labels(flares)
     with st.sidebar:
-        selected_flare_name = st.selectbox("Select Source", flare_names)
-        selected_flare = flares[flare_names.index(selected_flare_name)]
-        time_period = st.selectbox("Time Period", ["Last 24 Hours", "Last 7 Days", "Last 30 Days", "Last 90 Days"], index=1)
-        period_value = {"Last 24 Hours": "24h", "Last 7 Days": "7d", "Last 30 Days": "30d", "Last 90 Days": "90d"}[time_period]
+        selected_flare_name = st.selectbox("Select Source", list(flare_labels))
+        selected_flare = flare_labels[selected_flare_name]
+        time_period = st.selectbox("Time Period", list(PERIOD_OPTIONS), index=1)
+        period_value = PERIOD_OPTIONS[time_period]
     start_time, end_time, sampling_rate = get_time_range(period_value)
     st.subheader(f"{selected_flare['name']}")
     col1, col2 = st.columns(2)
@@ -231,48 +217,29 @@ def flare_detail():
 def comparison_view():
     st.header("📊 Source Comparison")
     flares = generate_mock_flares()
-    flare_names = [f"{f['name']} ({f['unit']})" for f in flares]
+    flare_labels = get_source_labels(flares)
+    flare_names = list(flare_labels)
     with st.sidebar:
         selected_flares = st.multiselect("Select Sources to Compare", flare_names, default=flare_names[:2] if len(flare_names) >= 2 else flare_names)
-        time_period = st.selectbox("Time Period", ["Last 24 Hours", "Last 7 Days", "Last 30 Days", "Last 90 Days"], index=1)
-        period_value = {"Last 24 Hours": "24h", "Last 7 Days": "7d", "Last 30 Days": "30d", "Last 90 Days": "90d"}[time_period]
+        time_period = st.selectbox("Time Period", list(PERIOD_OPTIONS), index=1)
+        period_value = PERIOD_OPTIONS[time_period]
     if not selected_flares:
         st.warning("Please select at least one source to compare.")
         return
     start_time, end_time, sampling_rate = get_time_range(period_value)
+    selected = [flare_labels[flare_name] for flare_name in selected_flares]
+    # Load each selected source once; the charts and the summary table both reuse it
+    loaded = get_source_series(selected, start_time, end_time, sampling_rate)
+    chart_series = [(flare['name'], df) for flare, df in loaded]
     st.subheader("HRVOC by Source")
-    fig_hrvoc = go.Figure()
-    for flare_name in selected_flares:
-        flare = flares[flare_names.index(flare_name)]
-        try:
-            df = get_flare_data(flare['id'], start_time, end_time, sampling_rate)
-            if not df.empty and 'total_hrvoc' in df.columns:
-                fig_hrvoc.add_trace(go.Scatter(x=df['timestamp'], y=df['total_hrvoc'], mode='lines', name=flare['name'],
-                    hovertemplate=f'<b>{flare["name"]}</b><br>Time: %{{x}}<br>HRVOC: %{{y:.2f}} lbs/hr<extra></extra>'))
-        except Exception:
-            continue
-    fig_hrvoc.update_layout(title='HRVOC Comparison', xaxis_title='Time', yaxis_title='HRVOC (lbs/hr)', hovermode='x unified', height=400, template='plotly_white')
-    st.plotly_chart(fig_hrvoc, use_container_width=True)
+    st.plotly_chart(create_multi_source_chart(chart_series, 'total_hrvoc', 'HRVOC Comparison', 'HRVOC (lbs/hr)', 'HRVOC', '%{y:.2f} lbs/hr'), use_container_width=True)
     st.subheader("Heat Release by Source")
-    fig_heat = go.Figure()
-    for flare_name in selected_flares:
-        flare = flares[flare_names.index(flare_name)]
-        try:
-            df = get_flare_data(flare['id'], start_time, end_time, sampling_rate)
-            if not df.empty and 'total_heat_release' in df.columns:
-                fig_heat.add_trace(go.Scatter(x=df['timestamp'], y=df['total_heat_release'], mode='lines', name=flare['name'],
-                    hovertemplate=f'<b>{flare["name"]}</b><br>Time: %{{x}}<br>Heat Release: %{{y:.4f}} MMBTU/hr<extra></extra>'))
-        except Exception:
-            continue
-    fig_heat.update_layout(title='Heat Release Comparison', xaxis_title='Time', yaxis_title='Heat Release (MMBTU/hr)', hovermode='x unified', height=400, template='plotly_white')
-    st.plotly_chart(fig_heat, use_container_width=True)
+    st.plotly_chart(create_multi_source_chart(chart_series, 'total_heat_release', 'Heat Release Comparison', 'Heat Release (MMBTU/hr)', 'Heat Release', '%{y:.4f} MMBTU/hr'), use_container_width=True)
     st.divider()
     st.subheader("Comparison Summary")
     comparison_data = []
-    for flare_name in selected_flares:
-        flare = flares[flare_names.index(flare_name)]
+    for flare, df in loaded:
         try:
-            df = get_flare_data(flare['id'], start_time, end_time, sampling_rate)
             if not df.empty:
                 comparison_data.append({'Source': flare['name'], 'Unit': flare['unit'], 'Total HRVOC': f"{df['total_hrvoc'].sum():,.0f} lbs", 'Total Heat Release': f"{df['total_heat_release'].sum():,.2f} MMBTU", 'Avg Flow Rate': f"{df['flow_rate'].mean():,.0f} scf/hr", 'Avg Heat Value': f"{df['heat_value'].mean():.0f} BTU/scf"})
         except Exception:
@@ -286,7 +253,8 @@ def comparison_view():
 def reporting_page():
     st.header("📄 Reporting & Export")
     flares = generate_mock_flares()
-    flare_names = [f"{f['name']} ({f['unit']})" for f in flares]
+    flare_labels = get_source_labels(flares)
+    flare_names = list(flare_labels)
     with st.form("report_config"):
         st.subheader("Report Configuration")
         col1, col2 = st.columns(2)
@@ -294,7 +262,7 @@ def reporting_page():
             report_type = st.selectbox("Report Type", ["Daily", "Weekly", "Monthly", "Custom"])
             selected_flares_report = st.multiselect("Select Sources", flare_names, default=flare_names)
         with col2:
-            time_period = st.selectbox("Time Period", ["Last 24 Hours", "Last 7 Days", "Last 30 Days", "Last 90 Days"], index=1)
+            time_period = st.selectbox("Time Period", list(PERIOD_OPTIONS), index=1)
             metrics = st.multiselect("Metrics to Include", ["HRVOC", "Heat Release", "Flow Rate", "Gas Composition", "Mass Emissions"], default=["HRVOC", "Heat Release", "Flow Rate"])
         submitted = st.form_submit_button("Generate Report")
     if submitted:
@@ -303,11 +271,11 @@ def reporting_page():
         elif not metrics:
             st.warning("Please select at least one metric.")
         else:
-            period_value = {"Last 24 Hours": "24h", "Last 7 Days": "7d", "Last 30 Days": "30d", "Last 90 Days": "90d"}[time_period]
+            period_value = PERIOD_OPTIONS[time_period]
             start_time, end_time, sampling_rate = get_time_range(period_value)
             report_data = []
             for flare_name in selected_flares_report:
-                flare = flares[flare_names.index(flare_name)]
+                flare = flare_labels[flare_name]
                 try:
                     df = get_flare_data(flare['id'], start_time, end_time, sampling_rate)
                     if not df.empty:
@@ -327,7 +295,7 @@ def reporting_page():
 def tag_configuration():
     st.header("⚙️ Tag Configuration")
     st.subheader("CDF Connection Status")
-    is_connected, status_msg = get_cdf_connection_status()
+    is_connected, status_msg = get_connection_status()
     if is_connected:
         st.success(f"✅ {status_msg}")
     else:
@@ -341,8 +309,7 @@ def tag_configuration():
     st.subheader("Detailed Tag Lookup Table")
     for flare_id, config in FLARE_TAG_LOOKUP.items():
         with st.expander(f"📊 {config['name']} ({config['unit']})"):
-            st.write(f"**Unit:** {config['unit']}")
-            st.write("**Tag Mappings:**")
+            st.markdown(f"**Unit:** {config['unit']}  \n**Tag Mappings:**")
             tag_data = []
             for tag_name, tag_config in config.get("tags", {}).items():
                 source = tag_config.get("source", "mock")
@@ -353,18 +320,23 @@ def tag_configuration():
     st.info("Time series are populated by running: python scripts/populate_edr_timeseries.py")
 
 
+PAGES = {"Dashboard": dashboard_overview, "Source Details": flare_detail, "Comparison": comparison_view, "Reporting": reporting_page, "Tag Configuration": tag_configuration}
+
+
 def main():
-    pages = {"Dashboard": dashboard_overview, "Source Details": flare_detail, "Comparison": comparison_view, "Reporting": reporting_page, "Tag Configuration": tag_configuration}
-    selected_page = st.sidebar.selectbox("Navigation", list(pages.keys()))
+    selected_page = st.sidebar.selectbox("Navigation", list(PAGES))
     st.sidebar.divider()
     st.sidebar.write(f"**Version**: {VERSION}")
     st.sidebar.markdown("**Data Sources:**")
-    is_connected, _ = get_cdf_connection_status()
+    # Reserve the badge slot but fill it after the page renders, so building the
+    # client (SDK import + token inspect) doesn't hold up the page's first elements
+    status_badge = st.sidebar.empty()
+    PAGES[selected_page]()
+    is_connected, _ = get_connection_status()
     if is_connected:
-        st.sidebar.success("🟢 CDF Connected")
+        status_badge.success("🟢 CDF Connected")
     else:
-        st.sidebar.warning("🟡 Mock Data Only")
-    pages[selected_page]()
+        status_badge.warning("🟡 Mock Data Only")
 
 
 if __name__ == "__main__":
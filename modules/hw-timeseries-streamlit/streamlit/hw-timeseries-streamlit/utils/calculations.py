@@ -5,9 +5,12 @@ Calculates mass emissions, HRVOC, and Heat Release from raw sensor/source data.
 
 import pandas as pd
 import numpy as np
+from functools import lru_cache
 from typing import Dict, Optional, List
 
 
+# Constant tables: built once and shared, callers only read from them
+@lru_cache(maxsize=1)
 def load_calculation_params() -> Dict:
     config = {
         'molecular_weights': {
@@ -3,19 +3,26 @@ CDF Data: fetch time series from Cognite Data Fusion.
 Supports retrieval by external_id (e.g. edr_training_*) or by name/id.
 """
 
+import importlib.util
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from utils.tag_lookup import get_live_tags, get_flare_config
 
-try:
+if TYPE_CHECKING:
     from cognite.client import CogniteClient
-    CDF_AVAILABLE = True
+
+# Check for the SDK without importing it; the import itself is deferred to
+# get_cdf_client so the first page render does not wait on it
+try:
+    CDF_AVAILABLE = importlib.util.find_spec("cognite.client") is not None
 except ImportError:
     CDF_AVAILABLE = False
 
 _client = None
+# name/external_id -> internal id; only successful lookups are kept
+_ts_id_cache: Dict[str, int] = {}
 
 
 def get_cdf_client() -> Optional["CogniteClient"]:
@@ -25,6 +32,7 @@ def get_cdf_client() -> Optional["CogniteClient"]:
     if _client is not None:
         return _client
     try:
+        from cognite.client import CogniteClient
         _client = CogniteClient()
         return _client
     except Exception as e:
@@ -40,20 +48,34 @@ def _resolve_ts_id(client: "CogniteClient", ts_name_or_id) -> Optional[int]:
     if isinstance(ts_name_or_id, str) and ts_name_or_id.isdigit():
         return int(ts_name_or_id)
     if isinstance(ts_name_or_id, str):
+        if ts_name_or_id in _ts_id_cache:
+            return _ts_id_cache[ts_name_or_id]
         # Try by external_id first (e.g. edr_training_..._flow_rate)
         try:
             ts = client.time_series.retrieve(external_id=ts_name_or_id)
             if ts:
+                _ts_id_cache[ts_name_or_id] = ts.id
                 return ts.id
         except Exception:
             pass
-        # Fallback: search by name
-        for ts in client.time_series.list(limit=1000):
-            if ts.name == ts_name_or_id:
-                return ts.id
+        # Fallback: exact name match, filtered server-side
+        for ts in client.time_series.list(name=ts_name_or_id, limit=1):
+            _ts_id_cache[ts_name_or_id] = ts.id
+            return ts.id
     return None
 
 
+def _datapoints_to_frame(datapoints) -> Optional[pd.DataFrame]:
+    """Convert a single-series Datapoints object to a timestamp/value DataFrame."""
+    df = datapoints.to_pandas()
+    if df.empty:
+        return None
+    df.columns = ['value']
+    df = df.reset_index()
+    df.columns = ['timestamp', 'value']
+    return df
+
+
 def find_timeseries_by_name(name: str) -> Optional[int]:
     client = get_cdf_client()
     if client is None:
@@ -84,13 +106,7 @@ def fetch_timeseries_data(
             granularity=granularity,
             aggregates=["average"]
         )
-        df = datapoints.to_pandas()
-        if df.empty:
-            return None
-        df.columns = ['value']
-        df = df.reset_index()
-        df.columns = ['timestamp', 'value']
-        return df
+        return _datapoints_to_frame(datapoints)
     except Exception as e:
         import streamlit as st
         st.warning(f"Failed to fetch data for {ts_name_or_id}: {e}")
@@ -116,13 +132,7 @@ def fetch_raw_timeseries_data(
             end=end_time,
             limit=limit
         )
-        df = datapoints.to_pandas()
-        if df.empty:
-            return None
-        df.columns = ['value']
-        df = df.reset_index()
-        df.columns = ['timestamp', 'value']
-        return df
+        return _datapoints_to_frame(datapoints)
     except Exception as e:
         import streamlit as st
         st.warning(f"Failed to fetch raw data for {ts_name_or_id}: {e}")
@@ -135,10 +145,43 @@ def fetch_flare_live_data(
     end_time: datetime,
     sampling_rate: str = "1h"
 ) -> Dict[str, pd.DataFrame]:
+    """Fetch all live tags of a source with one batched datapoints request.
+
+    Identifiers the batched request does not find (e.g. time series names rather
+    than external_ids) fall back to the per-tag lookup in fetch_timeseries_data.
+    If the batched request itself fails, the source gets no live data this time.
+    """
     live_tags = get_live_tags(flare_id)
+    client = get_cdf_client()
+    if client is None or not live_tags:
+        return {}
+    ids = [v for v in live_tags.values() if isinstance(v, int)]
+    external_ids = [v for v in live_tags.values() if not isinstance(v, int)]
+    try:
+        datapoints_list = client.time_series.data.retrieve(
+            id=ids or None,
+            external_id=external_ids or None,
+            start=start_time,
+            end=end_time,
+            granularity=sampling_rate,
+            aggregates=["average"],
+            ignore_unknown_ids=True
+        )
+    except Exception as e:
+        import streamlit as st
+        st.warning(f"Failed to fetch live data for {flare_id}: {e}")
+        # A network/auth failure would fail every per-tag retry too
+        return {}
     result = {}
     for tag_type, ts_identifier in live_tags.items():
-        df = fetch_timeseries_data(ts_identifier, start_time, end_time, sampling_rate)
+        if isinstance(ts_identifier, int):
+            datapoints = datapoints_list.get(id=ts_identifier)
+        else:
+            datapoints = datapoints_list.get(external_id=ts_identifier)
+        if datapoints is None:
+            df = fetch_timeseries_data(ts_identifier, start_time, end_time, sampling_rate)
+        else:
+            df = _datapoints_to_frame(datapoints)
         if df is not None:
             result[tag_type] = df
     return result
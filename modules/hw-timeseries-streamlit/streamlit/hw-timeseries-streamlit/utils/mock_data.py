@@ -8,8 +8,8 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
-from utils.tag_lookup import get_all_flares, get_flare_config, is_tag_live, get_tag_identifier
-from utils.cdf_data import fetch_timeseries_data
+from utils.tag_lookup import get_all_flares, get_flare_config
+from utils.cdf_data import fetch_flare_live_data
 
 
 def generate_mock_flares() -> List[Dict]:
@@ -51,29 +51,19 @@ def generate_mock_flare_data(
     n_points = len(timestamps)
     data = {"timestamp": timestamps}
 
+    # All live tags for this source in one request
+    live_data = fetch_flare_live_data(flare_id, start_time, end_time, sampling_rate)
+
     # Flow rate – live or mock
-    flow_rate = None
-    flow_rate_source = "mock"
-    if is_tag_live(flare_id, "flow_rate"):
-        ts_identifier = get_tag_identifier(flare_id, "flow_rate")
-        if ts_identifier:
-            live_df = fetch_timeseries_data(ts_identifier, start_time, end_time, sampling_rate)
-            if live_df is not None and not live_df.empty:
-                flow_rate = _align_timeseries(live_df, timestamps)
-                flow_rate_source = "live"
+    flow_rate = _live_values(live_data, "flow_rate", timestamps)
+    flow_rate_source = "mock" if flow_rate is None else "live"
     if flow_rate is None:
         flow_rate = _generate_mock_flow_rate(timestamps, flow_range)
     data["flow_rate"] = flow_rate
     data["flow_rate_source"] = flow_rate_source
 
     # Heat value – live or mock
-    heat_value = None
-    if is_tag_live(flare_id, "heat_value"):
-        ts_identifier = get_tag_identifier(flare_id, "heat_value")
-        if ts_identifier:
-            live_df = fetch_timeseries_data(ts_identifier, start_time, end_time, sampling_rate)
-            if live_df is not None and not live_df.empty:
-                heat_value = _align_timeseries(live_df, timestamps)
+    heat_value = _live_values(live_data, "heat_value", timestamps)
     if heat_value is None:
         base_heat = np.random.uniform(heat_range[0], heat_range[1], n_points)
         heat_value = base_heat + (flow_rate - np.nanmean(flow_rate)) / 10000
@@ -82,13 +72,7 @@ def generate_mock_flare_data(
     # Composition – live from CDF where configured, else mock
     comp_arrays = {}
     for tag_type, col in _COMP_TAG_TO_COL.items():
-        arr = None
-        if is_tag_live(flare_id, tag_type):
-            ts_identifier = get_tag_identifier(flare_id, tag_type)
-            if ts_identifier:
-                live_df = fetch_timeseries_data(ts_identifier, start_time, end_time, sampling_rate)
-                if live_df is not None and not live_df.empty:
-                    arr = _align_timeseries(live_df, timestamps)
+        arr = _live_values(live_data, tag_type, timestamps)
         if arr is None:
             # Config keys: nitrogen_range, co2_range, methane_range, ethane_range, other_voc_range
             rng_key = f"{tag_type}_range"
@@ -130,6 +114,13 @@ def _generate_mock_flow_rate(timestamps: pd.DatetimeIndex, flow_range: List[floa
     return flow_rate
 
 
+def _live_values(live_data: Dict[str, pd.DataFrame], tag_type: str, timestamps: pd.DatetimeIndex) -> Optional[np.ndarray]:
+    live_df = live_data.get(tag_type)
+    if live_df is not None and not live_df.empty:
+        return _align_timeseries(live_df, timestamps)
+    return None
+
+
 def _align_timeseries(live_df: pd.DataFrame, target_timestamps: pd.DatetimeIndex) -> np.ndarray:
     live_df = live_df.set_index("timestamp")
     target_series = pd.Series(index=target_timestamps, dtype=float)
@@ -5,7 +5,7 @@ Visualization Module - interactive charts for emission data
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 
 def create_hrvoc_chart(df: pd.DataFrame, flare_name: str = "") -> go.Figure:
@@ -82,3 +82,21 @@ def create_hrvoc_heat_release_chart(df: pd.DataFrame, flare_name: str = "") -> g
     fig.update_layout(title=f'HRVOC & Heat Release - {flare_name}' if flare_name else 'HRVOC & Heat Release',
         hovermode='x unified', height=400, template='plotly_white', legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
     return fig
+
+
+def create_multi_source_chart(
+    series: List[Tuple[str, pd.DataFrame]],
+    column: str,
+    title: str,
+    yaxis_title: str,
+    hover_label: str,
+    hover_value: str,
+) -> go.Figure:
+    """One line per source for `column`; series is a list of (source name, dataframe)."""
+    fig = go.Figure()
+    for name, df in series:
+        if not df.empty and column in df.columns:
+            fig.add_trace(go.Scatter(x=df['timestamp'], y=df[column], mode='lines', name=name,
+                hovertemplate=f'<b>{name}</b><br>Time: %{{x}}<br>{hover_label}: {hover_value}<extra></extra>'))
+    fig.update_layout(title=title, xaxis_title='Time', yaxis_title=yaxis_title, hovermode='x unified', height=400, template='plotly_white')
+    return fig
@@ -3,7 +3,7 @@
 Populate Cognite time series with sample data for HW Time Series Streamlit.
 
 Creates time series and datapoints for use with the HW Time Series Streamlit app.
-Pattern based on azure-eventhub-extractor: time_series.create() and time_series.data.insert().
+Pattern based on azure-eventhub-extractor: time_series.create() and time_series.data.insert_multiple().
 
 Usage:
   python scripts/populate_edr_timeseries.py
@@ -46,6 +46,9 @@ def _load_dotenv():
 
 _load_dotenv()
 
+# Variables that must be set to build the CDF client
+REQUIRED_ENV = ("CDF_URL", "CDF_PROJECT", "IDP_CLIENT_ID", "IDP_CLIENT_SECRET", "IDP_TOKEN_URL")
+
 # External ID prefix for all time series (HW Time Series Streamlit reads by this)
 EXTERNAL_ID_PREFIX = "edr_training_"
 
@@ -90,36 +93,38 @@ def generate_datapoints(
 ) -> List[Dict[str, Any]]:
     """Generate sample datapoints for one time series."""
     ranges = FLARE_RANGES.get(flare_id, FLARE_RANGES["FLARE_BP1_001"])
-    datapoints = []
-    current = start
     np.random.seed(hash(flare_id + tag_key) % (2**32))
 
-    while current <= end:
-        ts_ms = int(current.timestamp() * 1000)
-        if tag_key == "flow_rate":
-            lo, hi = ranges["flow_rate"]
-            # Slight daily pattern
-            hour = current.hour
-            mult = 1.0 + 0.15 * np.sin(2 * np.pi * (hour - 6) / 24)
-            value = float(np.clip(np.random.uniform(lo, hi) * mult, lo, hi * 1.1))
-        elif tag_key == "heat_value":
-            lo, hi = ranges["heat_value"]
-            value = float(np.random.uniform(lo, hi))
-        elif tag_key.endswith("_pct"):
-            comp = tag_key.replace("_pct", "")
-            comp_ranges = ranges["composition"]
-            if comp in comp_ranges:
-                lo, hi = comp_ranges[comp]
-                value = float(np.random.uniform(lo, hi))
-            else:
-                value = 0.0
-        else:
-            value = 0.0
-
-        datapoints.append({"timestamp": ts_ms, "value": value})
-        current += timedelta(hours=freq_hours)
-
-    return datapoints
+    # Resolve the value range for this tag once, not per datapoint
+    if tag_key in ("flow_rate", "heat_value"):
+        value_range = ranges[tag_key]
+    elif tag_key.endswith("_pct"):
+        value_range = ranges["composition"].get(tag_key[: -len("_pct")])
+    else:
+        value_range = None
+
+    # Build the whole series as arrays instead of one datapoint per loop iteration
+    step = timedelta(hours=freq_hours)
+    count = max((end - start) // step + 1, 0)
+    steps = np.arange(count)
+    timestamps = ((start.timestamp() + steps * step.total_seconds()) * 1000).astype(np.int64)
+
+    if value_range is None:
+        values = np.zeros(count)
+    elif tag_key == "flow_rate":
+        lo, hi = value_range
+        # Slight daily pattern
+        hours = (start.hour + steps * freq_hours) % 24
+        mult = 1.0 + 0.15 * np.sin(2 * np.pi * (hours - 6) / 24)
+        values = np.clip(np.random.uniform(lo, hi, count) * mult, lo, hi * 1.1)
+    else:
+        lo, hi = value_range
+        values = np.random.uniform(lo, hi, count)
+
+    return [
+        {"timestamp": ts_ms, "value": value}
+        for ts_ms, value in zip(timestamps.tolist(), values.tolist())
+    ]
 
 
 def main():
@@ -128,11 +133,13 @@ def main():
     from cognite.client.credentials import OAuthClientCredentials
     from cognite.client.data_classes import TimeSeries
 
-    cdf_url = os.getenv("CDF_URL")
-    cdf_project = os.getenv("CDF_PROJECT")
-    client_id = os.getenv("IDP_CLIENT_ID")
-    client_secret = os.getenv("IDP_CLIENT_SECRET")
-    token_url = os.getenv("IDP_TOKEN_URL")
+    # Read each required variable once; the status printout and the missing check both use this
+    required = {name: os.getenv(name) for name in REQUIRED_ENV}
+    cdf_url = required["CDF_URL"]
+    cdf_project = required["CDF_PROJECT"]
+    client_id = required["IDP_CLIENT_ID"]
+    client_secret = required["IDP_CLIENT_SECRET"]
+    token_url = required["IDP_TOKEN_URL"]
     scopes_raw = os.getenv("IDP_SCOPES", "")
 
     def _show(label: str, value: str | None, secret: bool = False) -> None:
@@ -143,17 +150,15 @@ def main():
             print(f"  ✗ {label}: NOT SET")
 
     print("CDF configuration:")
-    _show("CDF_URL", cdf_url)
-    _show("CDF_PROJECT", cdf_project)
-    _show("IDP_CLIENT_ID", client_id)
-    _show("IDP_CLIENT_SECRET", client_secret, secret=True)
-    _show("IDP_TOKEN_URL", token_url)
+    for name, value in required.items():
+        _show(name, value, secret=name == "IDP_CLIENT_SECRET")
     _show("IDP_SCOPES", scopes_raw or None)
     print()
 
-    if not all([cdf_url, cdf_project, client_id, client_secret, token_url]):
-        print("ERROR: One or more required variables are missing.")
-        print("  Add them to a .env file in the repo root (CDF_PROJECT, CDF_URL, IDP_CLIENT_ID, IDP_CLIENT_SECRET, IDP_TOKEN_URL).")
+    missing = [name for name, value in required.items() if not value]
+    if missing:
+        print(f"ERROR: Required variables are missing: {', '.join(missing)}")
+        print("  Add them to a .env file in the repo root.")
         sys.exit(1)
 
     # IDP_SCOPES may be a space-separated list (e.g. "https://az-eastus-1.cognitedata.com/.default")
@@ -204,17 +209,18 @@ def main():
         else:
             raise
 
-    # 2) Insert datapoints in batches (one external_id per call)
-    batch_size = 10000
+    # 2) Insert datapoints for every series in one call; the SDK splits the
+    # payload into requests and sends them concurrently
+    to_insert: List[Dict[str, Any]] = []
     for flare in FLARES:
         flare_id = flare["id"]
         for tag_key in TAG_SPECS:
             external_id = f"{EXTERNAL_ID_PREFIX}{flare_id}_{tag_key}"
             dps = generate_datapoints(flare_id, tag_key, start_time, end_time, freq_hours)
-            for i in range(0, len(dps), batch_size):
-                chunk = [{"timestamp": dp["timestamp"], "value": dp["value"]} for dp in dps[i : i + batch_size]]
-                client.time_series.data.insert(datapoints=chunk, external_id=external_id)
-            print(f"  {external_id}: {len(dps)} datapoints")
+            to_insert.append({"external_id": external_id, "datapoints": dps})
+    client.time_series.data.insert_multiple(to_insert)
+    for item in to_insert:
+        print(f"  {item['external_id']}: {len(item['datapoints'])} datapoints")
 
     print("Done. Run the HW Time Series Streamlit app; tag_lookup uses external_id (edr_training_*) for live data.")
 
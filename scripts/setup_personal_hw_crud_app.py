@@ -27,6 +27,7 @@ After running:
 """
 
 import argparse
+import os
 import re
 import shutil
 import subprocess
@@ -38,6 +39,12 @@ SOURCE_MODULE = "modules/hw-dm-crud-streamlit"
 SOURCE_APP_SUBDIR = "streamlit/hw-dm-crud-streamlit"
 SOURCE_DATASET_FILE = "data_sets/hw-dm-crud-streamlit-dataset.DataSet.yaml"
 
+# Valid personal-module suffix: lowercase letters, digits, inner hyphens
+SUFFIX_RE = re.compile(r"^[a-z0-9]([a-z0-9-]*[a-z0-9])?$")
+
+# Directories never copied into a personal app (build/runtime artifacts)
+SKIP_DIRS = {"__pycache__", ".git", ".venv", "node_modules", "dist", "build"}
+
 MODULE_TOML_TEMPLATE = """[module]
 title = "Hello World CRUD Streamlit ({suffix})"
 
@@ -147,6 +154,20 @@ def get_creator(repo_root: Path, suffix: str) -> str:
     return suffix
 
 
+def iter_app_files(source_dir: Path):
+    """Yield files under source_dir, without descending into SKIP_DIRS."""
+    stack = [source_dir]
+    while stack:
+        current = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(Path(entry.path))
+                elif entry.is_file():
+                    yield Path(entry.path)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description=(
@@ -166,7 +187,7 @@ def main():
     args = parser.parse_args()
 
     suffix = args.suffix.strip().lower()
-    if not re.match(r"^[a-z0-9]([a-z0-9-]*[a-z0-9])?$", suffix):
+    if not SUFFIX_RE.match(suffix):
         print("Error: suffix must be lowercase letters, numbers, or hyphens (e.g. jag, alice).")
         sys.exit(1)
 
@@ -231,14 +252,16 @@ def main():
     print("-" * 40)
     target_app_dir.mkdir(parents=True, exist_ok=True)
     copied_files = []
-    for p in sorted(source_app_dir.rglob("*")):
-        if p.is_file():
-            rel = p.relative_to(source_app_dir)
-            dest = target_app_dir / rel
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(p, dest)
-            copied_files.append(rel)
-            print(f"  Copied: {rel}")
+    source_files = sorted(iter_app_files(source_app_dir))
+    # Create each destination directory once up front, not once per file
+    for rel_dir in {p.parent.relative_to(source_app_dir) for p in source_files}:
+        (target_app_dir / rel_dir).mkdir(parents=True, exist_ok=True)
+    for p in source_files:
+        rel = p.relative_to(source_app_dir)
+        dest = target_app_dir / rel
+        shutil.copy2(p, dest)
+        copied_files.append(rel)
+        print(f"  Copied: {rel}")
     print()
 
     # --- 3. Write Streamlit YAML ---